@@ -11,29 +11,94 @@ from threading import Lock
 from openfl.utilities import TensorKey
 
 
+def _canonical_key(tensor_key):
+    """Return the tensor key with an integer round and tuple tags."""
+    tensor_name, origin, fl_round, report, tags = tensor_key
+    if isinstance(tags, str):
+        tags = (tags,)
+    else:
+        tags = tuple(tags)
+    return TensorKey(tensor_name, origin, int(fl_round), report, tags)
+
+
+def _read_only(nparray):
+    """Return a read-only, C-contiguous view of the nparray for storage.
+
+    Only strided arrays are copied. The caller's own array stays writable.
+    """
+    if not isinstance(nparray, np.ndarray):
+        return nparray
+    if nparray.flags.c_contiguous:
+        nparray = nparray.view()
+    else:
+        nparray = np.ascontiguousarray(nparray)
+    nparray.setflags(write=False)
+    return nparray
+
+
+def _dequantize(entry):
+    """Return the nparray of a store entry in the dtype it was cached with."""
+    nparray, original_dtype = entry
+    if original_dtype is None:
+        return np.asarray(nparray)
+    return nparray.astype(original_dtype)
+
+
 class TensorDB:
     """
     The TensorDB stores a tensor key and the data that it corresponds to.
 
-    It is built on top of a pandas dataframe
-    for it's easy insertion, retreival and aggregation capabilities. Each
+    It is built on top of a dictionary keyed by the tensor key, so that
+    insertion and retrieval are single hash lookups. A pandas dataframe
+    is only built on demand for the printable representation. Each
     collaborator and aggregator has its own TensorDB.
     """
 
-    def __init__(self):
-        """Initialize."""
-        self.tensor_db = pd.DataFrame([], columns=[
-            'tensor_name', 'origin', 'round', 'report', 'tags', 'nparray'
-        ])
+    def __init__(self, quantize_dtype=None):
+        """Initialize.
+
+        Args:
+            quantize_dtype: Optional narrower float dtype (e.g. np.float16)
+                            to store non-report floating point tensors in.
+                            They are cast back to their original dtype on
+                            read. None (default) stores tensors as given.
+        """
+        self.quantize_dtype = None if quantize_dtype is None else np.dtype(quantize_dtype)
+        if self.quantize_dtype is not None and self.quantize_dtype.kind != 'f':
+            raise ValueError(
+                'quantize_dtype must be a floating point dtype, got {}'.format(
+                    self.quantize_dtype))
+        # tensor key -> (nparray, original dtype or None if not quantized).
+        # Single-key reads of a dict are atomic, so lookups don't take
+        # the mutex. It only serializes writers and full-store iteration.
+        self._store = {}
+        # round number -> set of tensor keys cached for that round
+        self._round_index = {}
+        self._max_round = None
+        self._repr_cache = None
+        # Bumped by every write, so __repr__ can render outside the mutex
+        self._generation = 0
         self.mutex = Lock()
 
     def __repr__(self):
         """Representation of the object."""
-        with pd.option_context('display.max_rows', None):
-            return 'TensorDB contents:\n{}'.format(
-                self.tensor_db[
-                    ['tensor_name', 'origin', 'round', 'report', 'tags']
-                ])
+        columns = ['tensor_name', 'origin', 'round', 'report', 'tags']
+        with self.mutex:
+            if self._repr_cache is not None:
+                return self._repr_cache
+            tensor_keys = list(self._store)
+            generation = self._generation
+        # Build the view column by column, the nparrays are never touched
+        view = pd.DataFrame(
+            dict(zip(columns, map(list, zip(*tensor_keys)))), columns=columns)
+        # Only the first and last 20 rows are shown for large dbs
+        with pd.option_context('display.max_rows', 40, 'display.min_rows', 40):
+            representation = 'TensorDB contents:\n{}'.format(view)
+        with self.mutex:
+            # Don't cache a view of keys that a concurrent write has changed
+            if self._generation == generation:
+                self._repr_cache = representation
+        return representation
 
     def __str__(self):
         """Printable string representation."""
@@ -44,13 +109,21 @@ class TensorDB:
         if remove_older_than < 0:
             # Getting a negative argument calls off cleaning
             return
-        current_round = int(self.tensor_db['round'].max())
-        self.tensor_db = self.tensor_db[
-            self.tensor_db['round'] > current_round - remove_older_than
-        ].reset_index(drop=True)
+        with self.mutex:
+            if self._max_round is None:
+                return
+            old_rounds = [fl_round for fl_round in self._round_index
+                          if fl_round <= self._max_round - remove_older_than]
+            for fl_round in old_rounds:
+                for tensor_key in self._round_index.pop(fl_round):
+                    del self._store[tensor_key]
+            if len(self._round_index) == 0:
+                self._max_round = None
+            self._repr_cache = None
+            self._generation += 1
 
     def cache_tensor(self, tensor_key_dict):
-        """Insert tensor into TensorDB (dataframe).
+        """Insert tensor into TensorDB.
 
         Args:
             tensor_key_dict: The Tensor Key
@@ -58,27 +131,26 @@ class TensorDB:
         Returns:
             None
         """
-        entries_to_add = []
+        # Reads hand out the stored arrays without copying, so they are stored
+        # read-only, and strided ones are compacted once here. Each entry keeps
+        # its original dtype next to the array so a read is a single lookup.
+        entries = {}
+        for tensor_key, nparray in tensor_key_dict.items():
+            tensor_key = _canonical_key(tensor_key)
+            if self.quantize_dtype is not None and self._is_quantizable(tensor_key, nparray):
+                entries[tensor_key] = (
+                    _read_only(nparray.astype(self.quantize_dtype)), nparray.dtype)
+            else:
+                entries[tensor_key] = (_read_only(nparray), None)
         with self.mutex:
-            for tensor_key, nparray in tensor_key_dict.items():
-                tensor_name, origin, fl_round, report, tags = tensor_key
-                entries_to_add.append(
-                    pd.DataFrame([
-                        [tensor_name, origin, fl_round, report, tags, nparray]
-                    ],
-                        columns=[
-                            'tensor_name',
-                            'origin',
-                            'round',
-                            'report',
-                            'tags',
-                            'nparray']
-                    )
-                )
-
-            self.tensor_db = pd.concat(
-                [self.tensor_db, *entries_to_add], ignore_index=True
-            )
+            self._store.update(entries)
+            for tensor_key in entries:
+                fl_round = tensor_key[2]
+                self._round_index.setdefault(fl_round, set()).add(tensor_key)
+                if self._max_round is None or fl_round > self._max_round:
+                    self._max_round = fl_round
+            self._repr_cache = None
+            self._generation += 1
 
     def get_tensor_from_cache(self, tensor_key):
         """
@@ -87,18 +159,20 @@ class TensorDB:
         Returns the nparray if it is available
         Otherwise, it returns 'None'
         """
-        tensor_name, origin, fl_round, report, tags = tensor_key
-
         # TODO come up with easy way to ignore compression
-        df = self.tensor_db[(self.tensor_db['tensor_name'] == tensor_name)
-                            & (self.tensor_db['origin'] == origin)
-                            & (self.tensor_db['round'] == fl_round)
-                            & (self.tensor_db['report'] == report)
-                            & (self.tensor_db['tags'] == tags)]
+        entry = self._store.get(_canonical_key(tensor_key))
 
-        if len(df) == 0:
+        if entry is None:
             return None
-        return np.array(df['nparray'].iloc[0])
+        return _dequantize(entry)
+
+    def _is_quantizable(self, tensor_key, nparray):
+        """Check whether a tensor is stored in the quantized dtype."""
+        report = tensor_key[3]
+        return (not report
+                and isinstance(nparray, np.ndarray)
+                and nparray.dtype.kind == 'f'
+                and nparray.dtype.itemsize > self.quantize_dtype.itemsize)
 
     def get_aggregated_tensor(self, tensor_key, collaborator_weight_dict,
                               aggregation_functions):
@@ -123,10 +197,10 @@ class TensorDB:
             None if not all values are present
 
         """
-        if len(collaborator_weight_dict) != 0:
-            assert (np.abs(
-                1.0 - sum(collaborator_weight_dict.values())
-            ) < 0.01), \
+        weights = np.fromiter(collaborator_weight_dict.values(), dtype=np.float64,
+                              count=len(collaborator_weight_dict))
+        if weights.size != 0:
+            assert (np.abs(1.0 - weights.sum()) < 0.01), \
                 'Collaborator weights do not sum to 1.0:' \
                 ' {}'.format(collaborator_weight_dict)
 
@@ -134,58 +208,56 @@ class TensorDB:
             aggregation_functions = ['weighted_average']
 
         collaborator_names = collaborator_weight_dict.keys()
-        agg_tensor_dict = {}
 
         # Check if the aggregated tensor is already present in TensorDB
+        tensor_key = _canonical_key(tensor_key)
         tensor_name, origin, fl_round, report, tags = tensor_key
 
-        raw_df = self.tensor_db[(self.tensor_db['tensor_name'] == tensor_name)
-                                & (self.tensor_db['origin'] == origin)
-                                & (self.tensor_db['round'] == fl_round)
-                                & (self.tensor_db['report'] == report)
-                                & (self.tensor_db['tags'] == tags)]['nparray']
-        if len(raw_df) > 0:
-            return np.array(raw_df.iloc[0]), {}
-
-        for col in collaborator_names:
-            if type(tags) == str:
-                new_tags = tuple([tags] + [col])
-            else:
-                new_tags = tuple(list(tags) + [col])
-            raw_df = self.tensor_db[
-                (self.tensor_db['tensor_name'] == tensor_name)
-                & (self.tensor_db['origin'] == origin)
-                & (self.tensor_db['round'] == fl_round)
-                & (self.tensor_db['report'] == report)
-                & (self.tensor_db['tags'] == new_tags)]['nparray']
-            # print(raw_df)
-            if len(raw_df) == 0:
-                print('No results for collaborator {}, TensorKey={}'.format(
-                    col, TensorKey(
-                        tensor_name, origin, report, fl_round, new_tags
-                    )))
-                return None, {}
-            else:
-                agg_tensor_dict[col] = raw_df.iloc[0]
-            # agg_tensor_dict[col] = agg_tensor_dict[col]
-            # * collaborator_weight_dict[col]
-
-        concat_nparray = np.array(list(agg_tensor_dict.values()))
+        entry = self._store.get(tensor_key)
+        if entry is not None:
+            return _dequantize(entry), {}
+
+        # Gather every collaborator tensor in a single pass over the names
+        collaborator_keys = [
+            (tensor_name, origin, fl_round, report, tags + (col,))
+            for col in collaborator_names
+        ]
+        collaborator_entries = [
+            self._store.get(collaborator_key) for collaborator_key in collaborator_keys
+        ]
+        missing = [col for col, entry in zip(collaborator_names, collaborator_entries)
+                   if entry is None]
+        if len(missing) > 0:
+            print('No results for collaborators {}, TensorKey={}'.format(
+                missing, tensor_key))
+            return None, {}
+
+        # One contiguous (n_collaborators, *tensor_shape) buffer shared by all reductions.
+        # Quantized tensors stay narrow here, see wide_nparray below.
+        stacked_nparray = np.stack([nparray for nparray, _ in collaborator_entries])
+        original_dtypes = [original_dtype for _, original_dtype in collaborator_entries
+                           if original_dtype is not None]
+        wide_nparray = stacked_nparray if len(original_dtypes) == 0 else None
 
         aggregated_tensorkey_is_set = False
         agg_metadata_dict = {}
 
         for aggregation_function in aggregation_functions:
             if aggregation_function == 'weighted_average':
-                agg_nparray = np.average(
-                    concat_nparray,
-                    weights=np.array(list(collaborator_weight_dict.values())),
-                    axis=0
-                )
+                # Same result as np.average(axis=0), contracted over the
+                # collaborator axis without an (n, *shape) weighted temporary.
+                # einsum casts a quantized stack to float64 in small buffers.
+                agg_nparray = np.einsum(
+                    'i,i...->...', weights, stacked_nparray) / weights.sum()
             else:
                 agg_func = getattr(np, aggregation_function, None)
                 if callable(agg_func):
-                    agg_nparray = agg_func(concat_nparray, axis=0)
+                    if wide_nparray is None:
+                        # Other reductions accumulate in the input dtype, so a
+                        # quantized stack is widened once, on first use
+                        wide_nparray = stacked_nparray.astype(
+                            np.result_type(*original_dtypes))
+                    agg_nparray = agg_func(wide_nparray, axis=0)
                 else:
                     raise KeyError(
                         '{} is not a valid numpy function'.format(
@@ -197,8 +269,10 @@ class TensorDB:
                 # Cache aggregated tensor in TensorDB
                 self.cache_tensor({tensor_key: agg_nparray})
                 aggregated_tensorkey_is_set = True
-                primary_agg = agg_nparray
+                # Read it back so this call returns exactly what later
+                # cache hits will, including any quantization round trip
+                primary_agg = self.get_tensor_from_cache(tensor_key)
             else:
-                agg_metadata_dict[aggregation_function] = np.array(agg_nparray)
+                agg_metadata_dict[aggregation_function] = np.asarray(agg_nparray)
 
-        return np.array(primary_agg), agg_metadata_dict
+        return np.asarray(primary_agg), agg_metadata_dict
@@ -75,20 +75,11 @@ class FrameworkAdapterPlugin(FrameworkAdapterPluginInterface):
             tensor_dict: the tensor dictionary
             with_opt_vars (bool): True = include the optimizer's status.
         """
-        model_weight_names = [weight.name for weight in model.weights]
-        model_weights_dict = {
-            name: tensor_dict[name] for name in model_weight_names
-        }
-        _set_weights_dict(model, model_weights_dict)
+        model.set_weights([tensor_dict[weight.name] for weight in model.weights])
 
         if optimizer is not None:
-            opt_weight_names = [
-                weight.name for weight in optimizer.weights
-            ]
-            opt_weights_dict = {
-                name: tensor_dict[name] for name in opt_weight_names
-            }
-            _set_weights_dict(optimizer, opt_weights_dict)
+            optimizer.set_weights(
+                [tensor_dict[weight.name] for weight in optimizer.weights])
 
 
 def _get_weights_dict(obj, suffix=''):
@@ -105,27 +96,8 @@ def _get_weights_dict(obj, suffix=''):
     dict
         The weight dictionary.
     """
-    weights_dict = {}
-    weight_names = [weight.name for weight in obj.weights]
-    weight_values = obj.get_weights()
-    for name, value in zip(weight_names, weight_values):
-        weights_dict[name + suffix] = value
-    return weights_dict
-
-
-def _set_weights_dict(obj, weights_dict):
-    """Set the object weights with a dictionary.
-
-    The obj can be a model or an optimizer.
-
-    Args:
-        obj (Model or Optimizer): The target object that we want to set
-        the weights.
-        weights_dict (dict): The weight dictionary.
-
-    Returns:
-        None
-    """
-    weight_names = [weight.name for weight in obj.weights]
-    weight_values = [weights_dict[name] for name in weight_names]
-    obj.set_weights(weight_values)
+    if suffix == '':
+        return {weight.name: value
+                for weight, value in zip(obj.weights, obj.get_weights())}
+    return {weight.name + suffix: value
+            for weight, value in zip(obj.weights, obj.get_weights())}
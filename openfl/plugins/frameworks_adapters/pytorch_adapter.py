@@ -42,7 +42,8 @@ class FrameworkAdapterPlugin(FrameworkAdapterPluginInterface):
         # Grabbing keys from model's state_dict helps to confirm we have
         # everything
         for k in model.state_dict():
-            new_state[k] = pt.from_numpy(tensor_dict.pop(k)).to(device)
+            # TensorDB hands out its own arrays, torch must not share them
+            new_state[k] = pt.from_numpy(tensor_dict.pop(k).copy()).to(device)
 
         # set model state
         model.load_state_dict(new_state)
@@ -231,7 +232,9 @@ def expand_derived_opt_state_dict(derived_opt_state_dict, device):
             for subkey, tag in state_subkeys_and_tags:
                 flat_key = '__opt_state_{}_{}_{}'.format(this_id, tag, subkey)
                 if tag == 'istensor':
-                    new_v = pt.from_numpy(derived_opt_state_dict.pop(flat_key))
+                    # Optimizers update their state in place, so it must not
+                    # share memory with the arrays cached in TensorDB
+                    new_v = pt.from_numpy(derived_opt_state_dict.pop(flat_key).copy())
                 else:
                     # Here (for currrently supported optimizers) the subkey
                     # should be 'step' and the length of array should be one.
@@ -4,6 +4,7 @@
 
 import pytest
 import numpy as np
+import pandas as pd
 
 from openfl.databases.tensor_db import TensorDB
 from openfl.utilities.types import TensorKey
@@ -67,6 +68,49 @@ def test_cache_and_get_tensor(nparray, tensor_key):
     assert np.array_equal(nparray, cached_nparray)
 
 
+def test_get_tensor_from_cache_no_copy(nparray, tensor_key):
+    """Test that a cache hit does not copy the stored array."""
+    db = TensorDB()
+    db.cache_tensor({tensor_key: nparray})
+    cached_nparray = db.get_tensor_from_cache(tensor_key)
+
+    assert np.shares_memory(nparray, cached_nparray)
+
+
+def test_get_tensor_from_cache_read_only(nparray, tensor_key):
+    """Test that writing to a returned array fails and leaves the cache unchanged."""
+    db = TensorDB()
+    nparray = nparray.copy()
+    db.cache_tensor({tensor_key: nparray})
+    cached_nparray = db.get_tensor_from_cache(tensor_key)
+
+    with pytest.raises(ValueError):
+        cached_nparray[...] = 0
+    assert np.array_equal(nparray, db.get_tensor_from_cache(tensor_key))
+    assert nparray.flags.writeable
+
+
+def test_cache_tensor_contiguous(tensor_key):
+    """Test that strided arrays are stored C-contiguous."""
+    db = TensorDB()
+    nparray = np.arange(12, dtype=np.float32).reshape(3, 4).T
+    db.cache_tensor({tensor_key: nparray})
+    cached_nparray = db.get_tensor_from_cache(tensor_key)
+
+    assert cached_nparray.flags.c_contiguous
+    assert np.array_equal(nparray, cached_nparray)
+
+
+def test_get_tensor_canonical_key(nparray):
+    """Test that string tags and numpy rounds resolve to the same entry."""
+    db = TensorDB()
+    db.cache_tensor({TensorKey('tensor_name', 'col1', 1, False, 'model'): nparray})
+    cached_nparray = db.get_tensor_from_cache(
+        TensorKey('tensor_name', 'col1', np.int64(1), False, ('model',)))
+
+    assert np.array_equal(nparray, cached_nparray)
+
+
 def test_tensor_from_cache_empty(tensor_key):
     """Test get works returns None if tensor key is not in the db."""
     db = TensorDB()
@@ -79,7 +123,7 @@ def test_clean_up(nparray, tensor_key):
     db = TensorDB()
 
     db.cache_tensor({tensor_key: nparray})
-    db.tensor_db['round'] = 2
+    db.cache_tensor({tensor_key._replace(round_number=2): nparray})
     db.clean_up()
     cached_nparray = db.get_tensor_from_cache(tensor_key)
 
@@ -97,14 +141,40 @@ def test_clean_up_not_old(nparray, tensor_key):
     assert np.array_equal(nparray, cached_nparray)
 
 
+def test_clean_up_keeps_last_rounds(nparray, tensor_key):
+    """Test that clean_up keeps exactly the last remove_older_than rounds."""
+    db = TensorDB()
+
+    for round_number in range(4):
+        db.cache_tensor({tensor_key._replace(round_number=round_number): nparray})
+    db.clean_up(remove_older_than=2)
+
+    for round_number, kept in [(0, False), (1, False), (2, True), (3, True)]:
+        cached_nparray = db.get_tensor_from_cache(
+            tensor_key._replace(round_number=round_number))
+        assert (cached_nparray is not None) == kept
+
+
+def test_clean_up_all_then_older_round(nparray, tensor_key):
+    """Test that emptying the db resets the newest round used by clean_up."""
+    db = TensorDB()
+
+    db.cache_tensor({tensor_key._replace(round_number=5): nparray})
+    db.clean_up(remove_older_than=0)
+    db.cache_tensor({tensor_key: nparray})
+    db.clean_up()
+    cached_nparray = db.get_tensor_from_cache(tensor_key)
+
+    assert np.array_equal(nparray, cached_nparray)
+
+
 def test_clean_up_not_clean_up_with_negative_argument(nparray, tensor_key):
     """Test that clean_up don't remove if records remove_older_than is negative."""
     db = TensorDB()
 
     db.cache_tensor({tensor_key: nparray})
-    db.tensor_db['round'] = 2
+    db.cache_tensor({tensor_key._replace(round_number=2): nparray})
     db.clean_up(remove_older_than=-1)
-    db.tensor_db['round'] = 0
     cached_nparray = db.get_tensor_from_cache(tensor_key)
 
     assert np.array_equal(nparray, cached_nparray)
@@ -231,3 +301,101 @@ def test_get_aggregated_tensor_multiple_aggregation_functions(tensor_db):
     assert np.array_equal(agg_nparray, np.array([2, 4, 6, 8, 10]))
     assert 'mean' in agg_metadata_dict
     assert np.array_equal(agg_metadata_dict['mean'], np.array([1., 2., 3., 4., 5.]))
+
+
+def test_clean_up_empty():
+    """Test that clean_up works on an empty db."""
+    db = TensorDB()
+    db.clean_up()
+
+    assert 'TensorDB contents' in repr(db)
+
+
+def test_repr_updated_after_cache(nparray, tensor_key):
+    """Test that the cached representation is refreshed by writes."""
+    db = TensorDB()
+    assert 'col1' not in repr(db)
+
+    db.cache_tensor({tensor_key: nparray})
+    assert 'col1' in repr(db)
+
+    db.clean_up(remove_older_than=0)
+    assert 'col1' not in repr(db)
+
+
+def test_repr_not_cached_after_concurrent_write(mocker, nparray, tensor_key):
+    """Test that a representation rendered during a write is not cached."""
+    db = TensorDB()
+    dataframe = pd.DataFrame
+
+    def write_while_rendering(*args, **kwargs):
+        db.cache_tensor({tensor_key: nparray})
+        return dataframe(*args, **kwargs)
+
+    mocker.patch('openfl.databases.tensor_db.pd.DataFrame', side_effect=write_while_rendering)
+    assert 'col1' not in repr(db)
+    mocker.stopall()
+
+    assert 'col1' in repr(db)
+
+
+def test_quantized_cache_and_get_tensor(tensor_key):
+    """Test that quantized tensors lose precision but are read back in their dtype."""
+    db = TensorDB(quantize_dtype=np.float16)
+    nparray = np.array([0.1, 1.5, -2.25], dtype=np.float32)
+    db.cache_tensor({tensor_key: nparray})
+    cached_nparray = db.get_tensor_from_cache(tensor_key)
+
+    assert cached_nparray.dtype == np.float32
+    assert np.array_equal(cached_nparray, nparray.astype(np.float16).astype(np.float32))
+    assert not np.array_equal(cached_nparray, nparray)
+
+
+def test_quantized_skips_report_tensors(tensor_key):
+    """Test that report tensors are never quantized."""
+    db = TensorDB(quantize_dtype=np.float16)
+    tensor_key = tensor_key._replace(report=True)
+    nparray = np.array(0.123456789, dtype=np.float64)
+    db.cache_tensor({tensor_key: nparray})
+
+    cached_nparray = db.get_tensor_from_cache(tensor_key)
+
+    assert cached_nparray.dtype == np.float64
+    assert cached_nparray == nparray
+
+
+def test_quantized_get_aggregated_tensor():
+    """Test that aggregation over quantized tensors runs in the original dtype."""
+    db = TensorDB(quantize_dtype=np.float16)
+    db.cache_tensor({
+        TensorKey('tensor_name', 'agg', 0, False, ('col1',)): np.array([0.5, 1.], np.float32),
+        TensorKey('tensor_name', 'agg', 0, False, ('col2',)): np.array([1.5, 2.], np.float32),
+    })
+    collaborator_weight_dict = {'col1': 0.5, 'col2': 0.5}
+    tensor_key = TensorKey('tensor_name', 'agg', 0, False, ())
+    agg_nparray, _ = db.get_aggregated_tensor(tensor_key, collaborator_weight_dict, ['sum'])
+
+    assert agg_nparray.dtype == np.float32
+    assert np.array_equal(agg_nparray, np.array([2., 3.]))
+
+
+def test_quantized_get_aggregated_tensor_repeatable():
+    """Test that computing and then re-reading a quantized aggregate give equal results."""
+    db = TensorDB(quantize_dtype=np.float16)
+    db.cache_tensor({
+        TensorKey('tensor_name', 'agg', 0, False, ('col1',)): np.array([0.1234], np.float32),
+        TensorKey('tensor_name', 'agg', 0, False, ('col2',)): np.array([0.3001], np.float32),
+    })
+    collaborator_weight_dict = {'col1': 0.5, 'col2': 0.5}
+    tensor_key = TensorKey('tensor_name', 'agg', 0, False, ())
+    first_nparray, _ = db.get_aggregated_tensor(tensor_key, collaborator_weight_dict, None)
+    second_nparray, _ = db.get_aggregated_tensor(tensor_key, collaborator_weight_dict, None)
+
+    assert first_nparray.dtype == second_nparray.dtype
+    assert np.array_equal(first_nparray, second_nparray)
+
+
+def test_quantize_dtype_not_float():
+    """Test that a non floating point quantize_dtype is rejected."""
+    with pytest.raises(ValueError):
+        TensorDB(quantize_dtype=np.int8)